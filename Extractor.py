@@ -9,22 +9,80 @@ Creator: © Ardean Bima Saputra
 - Opsi GPU (CUDA) untuk mempercepat decoding video
 - Preset: Optimasi Lagu + GPU
 - Tanpa dependensi eksternal (pure stdlib). Butuh ffmpeg & ffprobe di PATH.
+- Opsional: PyAV (`pip install av`) untuk remux mode COPY tanpa proses ffmpeg.
 """
 
 import os
+import re
 import sys
+import signal
+import json
+import shutil
+import hashlib
+import asyncio
+import tempfile
 import subprocess
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 import threading
-import queue
+from collections import deque
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, PhotoImage
 
+try:
+    import av  # opsional: remux COPY langsung lewat libav
+except ImportError:
+    av = None
+
 VIDEO_EXTS = {".mp4", ".mkv", ".mov", ".avi", ".webm", ".m4v"}
-DEFAULT_WORKERS = max(2, (os.cpu_count() or 4) // 2)
+_VIDEO_SUFFIXES = tuple(VIDEO_EXTS)
+DEFAULT_WORKERS = os.cpu_count() or 4
+PROBE_CACHE_NAME = ".probe_cache.json"
+SPLIT_THRESHOLD_SEC = 600   # file WAV lebih panjang dari ini dipecah per segmen
+SPLIT_MAX_PARTS = 4
+RAM_DISK_DIR = "/dev/shm"   # tmpfs (Linux) untuk file segmen sementara
+LOG_MAX_LINES = 5000
+POLL_BUSY_MS = 30           # interval poll UI saat ada update
+POLL_IDLE_MS = 150          # interval poll UI saat antrian kosong
+HASH_HEAD_BYTES = 1 << 20   # sidecar skip: hash 1 MB pertama file sumber
+CANCEL_GRACE_SEC = 2.0      # jeda antara SIGINT/terminate dan kill saat Cancel
+CORES_PER_WORKER = 2        # tiap ffmpeg re-encode di-pin ke sepasang core
+LOUDNORM_TARGET = "I=-16:TP=-1.5:LRA=11"
+LOUDNORM_FILTER_THREADS = 2
+
+# Cache hasil probe_file: (path, mtime_ns, size) -> info
+_probe_cache: Dict[Tuple[str, int, int], dict] = {}
+_probe_cache_lock = threading.Lock()
+
+# Jumlah engine NVDEC per GPU (SKU yang dikenal); lainnya dianggap 1
+NVDEC_ENGINES = {
+    "H100": 7,
+    "H200": 7,
+    "A100": 5,
+    "L4": 4,
+    "L40S": 3,
+    "L40": 3,
+    "A10": 2,
+    "A30": 4,
+}
+NVDEC_DEFAULT_ENGINES = 3
+
+# Decoder NVDEC (cuvid) per codec video
+CUVID_DECODERS = {
+    "h264": "h264_cuvid",
+    "hevc": "hevc_cuvid",
+    "av1": "av1_cuvid",
+    "vp8": "vp8_cuvid",
+    "vp9": "vp9_cuvid",
+    "mpeg1video": "mpeg1_cuvid",
+    "mpeg2video": "mpeg2_cuvid",
+    "mpeg4": "mpeg4_cuvid",
+    "vc1": "vc1_cuvid",
+    "mjpeg": "mjpeg_cuvid",
+}
 
 def resource_path(fname: str) -> str:
     """
@@ -50,33 +108,457 @@ def resource_path(fname: str) -> str:
 
 # ----------------- FFmpeg helpers -----------------
 
-def run_cmd(cmd: List[str]) -> Tuple[int, str, str]:
-    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+# Opsi Popen bersama untuk semua proses anak:
+# - Windows: tanpa jendela console (tidak berkedip, tanpa biaya setup console)
+# - POSIX: session sendiri agar Ctrl-C di terminal tidak ikut ke ffmpeg
+if sys.platform == "win32":
+    _STARTUPINFO = subprocess.STARTUPINFO()
+    _STARTUPINFO.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    _STARTUPINFO.wShowWindow = subprocess.SW_HIDE
+    _POPEN_KWARGS = {"startupinfo": _STARTUPINFO, "creationflags": subprocess.CREATE_NO_WINDOW}
+else:
+    _POPEN_KWARGS = {"start_new_session": True}
+
+def _decode_output(
+    out: Optional[bytes], err: Optional[bytes], code: int, keep_stderr: bool = False
+) -> Tuple[str, str]:
+    out_s = out.decode("utf-8", errors="replace") if out else ""
+    err_s = err.decode("utf-8", errors="replace") if err and (code != 0 or keep_stderr) else ""
+    return out_s, err_s
+
+def run_cmd(cmd: List[str], capture_stdout: bool = True, capture_stderr: bool = True) -> Tuple[int, str, str]:
+    """
+    Jalankan perintah. Output yang tidak dibutuhkan dibuang ke DEVNULL agar
+    tidak menumpuk di memori; stderr hanya di-decode jika proses gagal.
+    """
+    p = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
+        stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL,
+        **_POPEN_KWARGS,
+    )
     out, err = p.communicate()
-    return p.returncode, out, err
+    return (p.returncode, *_decode_output(out, err, p.returncode))
+
+def set_process_affinity(pid: int, cores: Set[int]) -> None:
+    """Pin proses ke core tertentu (Linux: sched_setaffinity, Windows: SetProcessAffinityMask)."""
+    try:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(pid, cores)
+        elif sys.platform == "win32":
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            PROCESS_SET_INFORMATION = 0x0200
+            PROCESS_QUERY_INFORMATION = 0x0400
+            handle = kernel32.OpenProcess(PROCESS_SET_INFORMATION | PROCESS_QUERY_INFORMATION, False, pid)
+            if handle:
+                try:
+                    mask = sum(1 << c for c in cores)
+                    kernel32.SetProcessAffinityMask(handle, ctypes.c_size_t(mask))
+                finally:
+                    kernel32.CloseHandle(handle)
+    except (OSError, AttributeError):
+        # proses sudah selesai / platform tidak mendukung: jalan tanpa pinning
+        pass
+
+def assign_worker_cores(workers: int) -> Dict[int, Set[int]]:
+    """
+    Peta worker slot -> set core, tiap slot mendapat pasangan core sendiri.
+    Jika core tidak cukup untuk semua slot, kosong: pinning yang saling tumpang
+    tindih hanya menghalangi scheduler memindahkan kerja ke core yang idle.
+    """
+    n = os.cpu_count() or 1
+    per = min(CORES_PER_WORKER, n)
+    if workers * per > n:
+        return {}
+    return {slot: set(range(slot * per, (slot + 1) * per)) for slot in range(workers)}
+
+# Callback (proses, sedang_berjalan) untuk melacak proses anak yang aktif
+ProcCallback = Callable[[asyncio.subprocess.Process, bool], None]
+
+async def run_cmd_async(
+    cmd: List[str], capture_stdout: bool = True, capture_stderr: bool = True, keep_stderr: bool = False,
+    affinity: Optional[Set[int]] = None, register_cb: Optional[ProcCallback] = None
+) -> Tuple[int, str, str]:
+    """
+    Versi asyncio dari run_cmd: tidak memakan satu OS thread per proses.
+    keep_stderr=True mengembalikan stderr walau proses sukses (mis. output loudnorm).
+    register_cb dipanggil saat proses mulai (True) dan selesai (False).
+    """
+    p = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
+        stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL,
+        **_POPEN_KWARGS,
+    )
+    if register_cb:
+        register_cb(p, True)
+    try:
+        if affinity:
+            set_process_affinity(p.pid, affinity)
+        out, err = await p.communicate()
+    finally:
+        if register_cb:
+            register_cb(p, False)
+    return (p.returncode, *_decode_output(out, err, p.returncode, keep_stderr))
 
 def ff_tools_ok() -> Tuple[bool, str]:
     for tool in ("ffmpeg", "ffprobe"):
-        code, _, _ = run_cmd([tool, "-version"])
+        code, _, _ = run_cmd([tool, "-version"], capture_stdout=False, capture_stderr=False)
         if code != 0:
             return False, f"{tool} tidak ditemukan di PATH."
     return True, ""
 
-def detect_audio_codec(file: Path, stream_selector: str) -> Optional[str]:
+@lru_cache(maxsize=1)
+def available_cuvid_decoders() -> Set[str]:
+    """Decoder *_cuvid yang benar-benar ada di build ffmpeg ini (cek sekali)."""
+    try:
+        code, out, _ = run_cmd(["ffmpeg", "-hide_banner", "-decoders"], capture_stderr=False)
+    except OSError:
+        return set()
+    if code != 0:
+        return set()
+    names = set()
+    for line in out.splitlines():
+        cols = line.split()
+        if len(cols) >= 2 and cols[1].endswith("_cuvid"):
+            names.add(cols[1])
+    return names
+
+def _parse_probe(info: dict) -> dict:
+    streams = info.get("streams", [])
+    audio_streams = [
+        {
+            "index": st.get("index"),
+            "lang": (st.get("tags") or {}).get("language"),
+            "codec": st.get("codec_name"),
+        }
+        for st in streams if st.get("codec_type") == "audio"
+    ]
+    video = next((st for st in streams if st.get("codec_type") == "video"), None)
+    try:
+        duration = float(info.get("format", {}).get("duration"))
+    except (TypeError, ValueError):
+        duration = None
+    return {
+        "audio_codec": audio_streams[0]["codec"] if audio_streams else None,
+        "video_codec": video.get("codec_name") if video else None,
+        "duration": duration,
+        "audio_streams": audio_streams,
+    }
+
+@lru_cache(maxsize=1)
+def detect_nvdec_engines() -> Optional[int]:
+    """Total engine NVDEC dari semua GPU (via nvidia-smi), None jika tidak terdeteksi."""
+    try:
+        code, out, _ = run_cmd(
+            ["nvidia-smi", "--query-gpu=name", "--format=csv,noheader"], capture_stderr=False
+        )
+    except OSError:
+        return None
+    if code != 0:
+        return None
+    total = 0
+    for name in filter(None, (line.strip() for line in out.splitlines())):
+        total += next(
+            (n for sku, n in NVDEC_ENGINES.items() if re.search(rf"\b{sku}\b", name)),
+            1
+        )
+    return total or None
+
+def compute_optimal_workers(use_gpu: bool) -> int:
+    """
+    CPU: satu worker per logical core.
+    GPU: dibatasi jumlah engine NVDEC agar proses ffmpeg tidak berebut decoder.
+    """
+    if not use_gpu:
+        return DEFAULT_WORKERS
+    engines = detect_nvdec_engines() or NVDEC_DEFAULT_ENGINES
+    return max(1, min(engines, DEFAULT_WORKERS))
+
+def _probe_cache_key(file: Path) -> Optional[tuple]:
+    try:
+        st = file.stat()
+    except OSError:
+        return None
+    return (str(file), st.st_mtime_ns, st.st_size)
+
+def cached_probe(file: Path, key: Optional[tuple] = None) -> Optional[dict]:
+    """Ambil hasil probe dari cache tanpa menjalankan ffprobe (None jika belum ada/berubah)."""
+    key = key or _probe_cache_key(file)
+    if key is None:
+        return None
+    with _probe_cache_lock:
+        return _probe_cache.get(key)
+
+def probe_file(file: Path) -> Optional[dict]:
+    """
+    Satu kali ffprobe (JSON) per file untuk semua metadata yang dibutuhkan:
+    {audio_codec, video_codec, duration, audio_streams: [{index, lang, codec}]}.
+    """
+    key = _probe_cache_key(file)
+    cached = cached_probe(file, key)
+    if cached:
+        return cached
+
     cmd = [
         "ffprobe", "-v", "error",
-        "-select_streams", stream_selector,
-        "-show_entries", "stream=codec_name",
-        "-of", "default=noprint_wrappers=1:nokey=1",
+        "-probesize", "32k", "-analyzeduration", "0", "-fflags", "+fastseek",
+        "-print_format", "json", "-show_streams", "-show_format",
         str(file)
     ]
-    code, out, _ = run_cmd(cmd)
-    if code == 0:
-        val = out.strip().splitlines()
-        if val:
-            return val[0].strip()
+    code, out, _ = run_cmd(cmd, capture_stderr=False)
+    if code != 0:
+        return None
+    try:
+        info = _parse_probe(json.loads(out))
+    except ValueError:
+        return None
+
+    if key is not None:
+        with _probe_cache_lock:
+            _probe_cache[key] = info
+    return info
+
+def select_audio_stream(info: dict, stream_selector: str) -> Optional[dict]:
+    """Terapkan selector ffmpeg (a:N atau a:m:language:xxx) ke hasil probe_file."""
+    audio = info.get("audio_streams", [])
+    parts = stream_selector.split(":")
+    if len(parts) == 2 and parts[1].isdigit():
+        idx = int(parts[1])
+        return audio[idx] if idx < len(audio) else None
+    if len(parts) == 4 and parts[1] == "m" and parts[2] == "language":
+        return next((st for st in audio if st["lang"] == parts[3]), None)
+    return audio[0] if audio else None
+
+# ----------------- Header sniffing (tanpa ffprobe) -----------------
+
+SNIFF_MKV_BYTES = 64 * 1024
+SNIFF_MP4_BYTES = 1024 * 1024
+
+MKV_AUDIO_CODECS = {
+    "A_AAC": "aac",
+    "A_OPUS": "opus",
+    "A_VORBIS": "vorbis",
+    "A_AC3": "ac3",
+    "A_EAC3": "eac3",
+    "A_FLAC": "flac",
+    "A_DTS": "dts",
+    "A_TRUEHD": "truehd",
+    "A_MPEG/L3": "mp3",
+}
+
+MP4_AUDIO_CODECS = {
+    b"mp4a": "aac",
+    b"ac-3": "ac3",
+    b"ec-3": "eac3",
+    b"Opus": "opus",
+    b"fLaC": "flac",
+    b".mp3": "mp3",
+}
+
+def _ebml_vint(buf, pos: int, strip_marker: bool) -> Tuple[int, int, bool]:
+    """Baca variable-size integer EBML: (nilai, panjang byte, ukuran unknown?)."""
+    first = buf[pos]
+    length, mask = 1, 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8 or pos + length > len(buf):
+        raise ValueError("EBML vint tidak valid")
+    value = first & (mask - 1) if strip_marker else first
+    for b in buf[pos + 1:pos + length]:
+        value = (value << 8) | b
+    unknown = strip_marker and value == (1 << (7 * length)) - 1
+    return value, length, unknown
+
+def _ebml_elements(buf, start: int, end: int):
+    """Iterasi (id, awal data, akhir data) elemen EBML dalam [start, end)."""
+    pos = start
+    while pos < end:
+        eid, id_len, _ = _ebml_vint(buf, pos, False)
+        size, size_len, unknown = _ebml_vint(buf, pos + id_len, True)
+        body = pos + id_len + size_len
+        yield eid, body, None if unknown else body + size
+        if unknown:
+            return
+        pos = body + size
+
+def _sniff_mkv(buf) -> Optional[List[dict]]:
+    elements = _ebml_elements(buf, 0, len(buf))
+    eid, _, header_end = next(elements)
+    if eid != 0x1A45DFA3 or header_end is None:        # EBML header
+        return None
+    eid, seg_start, seg_end = next(_ebml_elements(buf, header_end, len(buf)))
+    if eid != 0x18538067:                               # Segment
+        return None
+
+    for eid, body, end in _ebml_elements(buf, seg_start, min(seg_end or len(buf), len(buf))):
+        if eid == 0x1F43B675 or end is None:            # Cluster: Tracks tidak ada di header
+            return None
+        if eid != 0x1654AE6B:                           # Tracks
+            continue
+        if end > len(buf):
+            return None
+        streams = []
+        for index, (tid, t_body, t_end) in enumerate(
+            e for e in _ebml_elements(buf, body, end) if e[0] == 0xAE   # TrackEntry
+        ):
+            track_type, codec_id, lang = None, "", "eng"   # default Language Matroska = eng
+            for cid, c_body, c_end in _ebml_elements(buf, t_body, t_end):
+                if cid == 0x83:
+                    track_type = int.from_bytes(buf[c_body:c_end], "big")
+                elif cid == 0x86:
+                    codec_id = bytes(buf[c_body:c_end]).rstrip(b"\0").decode("ascii", "replace")
+                elif cid == 0x22B59C:
+                    lang = bytes(buf[c_body:c_end]).rstrip(b"\0").decode("ascii", "replace")
+            if track_type == 2:                         # audio
+                codec = MKV_AUDIO_CODECS.get(codec_id)
+                if codec is None and codec_id.startswith("A_AAC"):
+                    codec = "aac"
+                streams.append({"index": index, "lang": lang, "codec": codec})
+        return streams
     return None
 
+def _mp4_boxes(buf, start: int, end: int):
+    """Iterasi (type, awal data, akhir box) box ISO-BMFF dalam [start, end)."""
+    pos = start
+    while pos + 8 <= end:
+        size = int.from_bytes(buf[pos:pos + 4], "big")
+        btype = bytes(buf[pos + 4:pos + 8])
+        header = 8
+        if size == 1:
+            size = int.from_bytes(buf[pos + 8:pos + 16], "big")
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return
+        yield btype, pos + header, pos + size
+        pos += size
+
+def _mp4_child(buf, start: int, end: int, path: List[bytes]) -> Optional[Tuple[int, int]]:
+    for btype, body, box_end in _mp4_boxes(buf, start, end):
+        if btype == path[0]:
+            if len(path) == 1:
+                return body, box_end
+            return _mp4_child(buf, body, box_end, path[1:])
+    return None
+
+def _sniff_mp4(buf) -> Optional[List[dict]]:
+    moov = None
+    for btype, body, box_end in _mp4_boxes(buf, 0, len(buf)):
+        if btype == b"moov":
+            moov = (body, box_end)
+            break
+        if btype == b"mdat":                            # moov di akhir file (bukan faststart)
+            return None
+    if moov is None or moov[1] > len(buf):
+        return None
+
+    streams = []
+    traks = [(body, end) for btype, body, end in _mp4_boxes(buf, *moov) if btype == b"trak"]
+    for index, (t_body, t_end) in enumerate(traks):
+        hdlr = _mp4_child(buf, t_body, t_end, [b"mdia", b"hdlr"])
+        if hdlr is None or bytes(buf[hdlr[0] + 8:hdlr[0] + 12]) != b"soun":
+            continue
+        stsd = _mp4_child(buf, t_body, t_end, [b"mdia", b"minf", b"stbl", b"stsd"])
+        if stsd is None:
+            return None
+        fourcc = bytes(buf[stsd[0] + 12:stsd[0] + 16])   # version/flags + entry_count + size
+
+        lang = None
+        mdhd = _mp4_child(buf, t_body, t_end, [b"mdia", b"mdhd"])
+        if mdhd is not None:
+            off = mdhd[0] + (32 if buf[mdhd[0]] == 1 else 20)
+            packed = int.from_bytes(buf[off:off + 2], "big")
+            code = "".join(chr(((packed >> shift) & 0x1F) + 0x60) for shift in (10, 5, 0))
+            # kode bahasa Macintosh (QuickTime) bukan ISO-639-2: biarkan ffprobe yang menentukan
+            if code.isalpha() and code.islower() and code != "und":
+                lang = code
+        streams.append({"index": index, "lang": lang, "codec": MP4_AUDIO_CODECS.get(fourcc)})
+    return streams
+
+def _read_head(path: Path, limit: int, parser):
+    """Jalankan parser pada `limit` byte pertama file (mmap, fallback read biasa)."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return None
+        try:
+            import mmap
+            with mmap.mmap(f.fileno(), min(size, limit), access=mmap.ACCESS_READ) as mm:
+                return parser(mm)
+        except (ImportError, OSError, ValueError):
+            f.seek(0)
+            return parser(f.read(limit))
+
+def sniff_probe(path: Path) -> Optional[dict]:
+    """
+    Baca daftar stream audio langsung dari header MKV/WebM (Tracks) atau
+    MP4/MOV (moov/stsd) dalam bentuk yang sama dengan probe_file.
+    None jika format tidak dikenali / header tidak lengkap.
+    """
+    ext = path.suffix.lower()
+    if ext in (".mkv", ".webm"):
+        parser, limit = _sniff_mkv, SNIFF_MKV_BYTES
+    elif ext in (".mp4", ".m4v", ".mov"):
+        parser, limit = _sniff_mp4, SNIFF_MP4_BYTES
+    else:
+        return None
+    try:
+        streams = _read_head(path, limit, parser)
+    except (OSError, ValueError, StopIteration, IndexError):
+        return None
+    if not streams:
+        return None
+    return {
+        "audio_codec": streams[0]["codec"],
+        "video_codec": None,
+        "duration": None,
+        "audio_streams": streams,
+    }
+
+def load_probe_cache(path: Path) -> None:
+    """Muat cache probe dari JSON (abaikan jika tidak ada / rusak)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return
+    with _probe_cache_lock:
+        for entry in entries:
+            try:
+                fpath, mtime_ns, size, info = entry
+            except (TypeError, ValueError):
+                continue
+            if isinstance(info, dict):
+                _probe_cache[(fpath, int(mtime_ns), int(size))] = info
+
+def save_probe_cache(path: Path, files: List[Path]) -> None:
+    """Simpan hanya entri file batch ini yang masih cocok dengan stat terkini."""
+    keys = [key for key in map(_probe_cache_key, files) if key is not None]
+    with _probe_cache_lock:
+        entries = [[*key, _probe_cache[key]] for key in keys if key in _probe_cache]
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+    except OSError:
+        pass
+
+def batch_probe_files(files: List[Path], workers: int) -> Dict[Path, dict]:
+    """Probe semua file secara paralel sebelum encode dimulai."""
+    infos: Dict[Path, dict] = {}
+    if not files:
+        return infos
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(files)))) as ex:
+        futures = {ex.submit(probe_file, f): f for f in files}
+        for fut in as_completed(futures):
+            info = fut.result()
+            if info:
+                infos[futures[fut]] = info
+    return infos
+
 def pick_copy_extension(codec: str) -> str:
     mapping = {
         "aac": ".m4a",
@@ -100,20 +582,57 @@ def build_ffmpeg_cmd(
     loudnorm: bool,
     sample_rate: Optional[int],
     bitrate_k: Optional[int],
-    use_gpu: bool = False
+    use_gpu: bool = False,
+    video_codec: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    threads: Optional[int] = None,
+    loudnorm_measured: Optional[Dict[str, str]] = None
 ) -> List[str]:
-    base = ["ffmpeg", "-y"]
-    if use_gpu:
-        base += ["-hwaccel", "cuda"]  # GPU decoding
-    base += ["-i", str(src), "-vn", "-sn", "-dn", "-map", f"0:{stream_selector}"]
+    base = ["ffmpeg", "-y", "-loglevel", "error", "-nostats"]
 
     af = []
     if loudnorm:
-        af.append("loudnorm=I=-16:TP=-1.5:LRA=11")
+        base += ["-filter_threads", str(LOUDNORM_FILTER_THREADS)]
+        if loudnorm_measured:
+            # pass kedua: pakai hasil pengukuran pass pertama (mode linear)
+            m = loudnorm_measured
+            af.append(
+                f"loudnorm={LOUDNORM_TARGET}"
+                f":measured_I={m['input_i']}:measured_TP={m['input_tp']}"
+                f":measured_LRA={m['input_lra']}:measured_thresh={m['input_thresh']}"
+                f":offset={m['target_offset']}:linear=true"
+            )
+        else:
+            af.append(f"loudnorm={LOUDNORM_TARGET}")
 
     if mode == "COPY":
-        base += ["-c:a", "copy"]
-    elif mode == "MP3":
+        # remux saja: probe minimal, hanya stream audio yang di-map, video tidak disentuh
+        base += ["-fflags", "+fastseek", "-probesize", "32k", "-analyzeduration", "0"]
+        base += ["-i", str(src), "-map", f"0:{stream_selector}"]
+        base += ["-map_metadata", "-1", "-map_chapters", "-1", "-copyts", "-c", "copy"]
+    else:
+        if use_gpu:
+            decoder = CUVID_DECODERS.get(video_codec or "")
+            # -c:v dibuka saat input dibuka (walau -vn): decoder yang tidak ada di build
+            # ffmpeg membuat proses gagal, jadi pakai hanya jika memang terdaftar
+            if decoder and decoder in available_cuvid_decoders():
+                # pipeline NVDEC penuh: demux + decode tanpa decode CPU
+                base += ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda", "-c:v", decoder]
+            else:
+                base += ["-hwaccel", "cuda"]  # GPU decoding
+        # segmen split: seek di level demuxer (sebelum -i) ke keyframe terdekat, jauh lebih cepat
+        if start is not None:
+            base += ["-ss", f"{start:.3f}"]
+        if end is not None:
+            base += ["-to", f"{end:.3f}"]
+        base += ["-i", str(src), "-vn", "-sn", "-dn", "-map", f"0:{stream_selector}"]
+        if start is not None or end is not None:
+            # reset timestamp segmen ke nol (first_pts=0) dan isi celah timestamp kecil;
+            # ini tidak mengkompensasi encoder delay/padding di sambungan
+            af.append("aresample=async=1:first_pts=0")
+
+    if mode == "MP3":
         base += ["-c:a", "libmp3lame"]
         if bitrate_k:
             base += ["-b:a", f"{bitrate_k}k"]
@@ -134,20 +653,87 @@ def build_ffmpeg_cmd(
 
     if af:
         base += ["-af", ",".join(af)]
+    if threads and mode != "COPY":
+        base += ["-threads", str(threads)]
 
     base += [str(dst)]
     return base
 
+def build_loudnorm_measure_cmd(src: Path, stream_selector: str) -> List[str]:
+    """Pass pertama loudnorm: hanya mengukur, hasil JSON dicetak ke stderr."""
+    return [
+        "ffmpeg", "-hide_banner", "-nostats", "-loglevel", "info",
+        "-filter_threads", str(LOUDNORM_FILTER_THREADS),
+        "-i", str(src), "-vn", "-sn", "-dn", "-map", f"0:{stream_selector}",
+        "-af", f"loudnorm={LOUDNORM_TARGET}:print_format=json",
+        "-f", "null", "-"
+    ]
+
+def parse_loudnorm_stats(stderr: str) -> Optional[Dict[str, str]]:
+    start = stderr.rfind("{")
+    end = stderr.find("}", start)
+    if start < 0 or end < 0:
+        return None
+    try:
+        stats = json.loads(stderr[start:end + 1])
+    except ValueError:
+        return None
+    keys = ("input_i", "input_tp", "input_lra", "input_thresh", "target_offset")
+    if not all(k in stats for k in keys):
+        return None
+    # audio hening menghasilkan -inf, tidak bisa dipakai untuk mode linear
+    try:
+        if not all(abs(float(stats[k])) != float("inf") for k in keys):
+            return None
+    except ValueError:
+        return None
+    return {k: stats[k] for k in keys}
+
+async def measure_loudness(
+    src: Path, stream_selector: str, affinity: Optional[Set[int]] = None,
+    register_cb: Optional[ProcCallback] = None
+) -> Optional[Dict[str, str]]:
+    code, _, err = await run_cmd_async(
+        build_loudnorm_measure_cmd(src, stream_selector), capture_stdout=False, keep_stderr=True,
+        affinity=affinity, register_cb=register_cb
+    )
+    if code != 0:
+        return None
+    return parse_loudnorm_stats(err)
+
+def build_concat_cmd(list_file: Path, dst: Path) -> List[str]:
+    return [
+        "ffmpeg", "-y", "-loglevel", "error", "-nostats",
+        "-f", "concat", "-safe", "0", "-i", str(list_file),
+        "-c", "copy", str(dst)
+    ]
+
 # ----------------- Worker logic -----------------
 
 def scan_files(input_dir: Path, recursive: bool) -> List[Path]:
-    if recursive:
-        return [p for p in input_dir.rglob("*") if p.is_file() and p.suffix.lower() in VIDEO_EXTS]
-    return [p for p in input_dir.glob("*") if p.is_file() and p.suffix.lower() in VIDEO_EXTS]
+    # os.scandir: tipe entry sudah di-cache dari DirEntry, Path hanya dibuat untuk file yang lolos
+    found: List[Path] = []
+    stack = [str(input_dir)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_file():
+                        if entry.name.lower().endswith(_VIDEO_SUFFIXES):
+                            found.append(Path(entry.path))
+                    elif recursive and entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                except OSError:
+                    continue
+    return found
 
 def make_out_path(
     src: Path, input_root: Path, output_root: Path, preserve_tree: bool,
-    mode: str, stream_selector: str
+    mode: str, stream_selector: str, probe: Optional[dict] = None
 ) -> Path:
     if preserve_tree:
         rel = src.relative_to(input_root)
@@ -156,8 +742,8 @@ def make_out_path(
         stem = Path(src.stem)
 
     if mode == "COPY":
-        codec = detect_audio_codec(src, stream_selector)
-        ext = pick_copy_extension(codec or "aac")
+        stream = select_audio_stream(probe or probe_file(src) or {}, stream_selector)
+        ext = pick_copy_extension((stream or {}).get("codec") or "aac")
     elif mode == "MP3":
         ext = ".mp3"
     elif mode == "AAC":
@@ -165,22 +751,215 @@ def make_out_path(
     else:
         ext = ".wav"
 
-    out_path = (output_root / stem).with_suffix(ext)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    return out_path
+    return (output_root / stem).with_suffix(ext)
+
+def make_out_dirs(files: List[Path], input_root: Path, output_root: Path, preserve_tree: bool) -> None:
+    """Buat folder output sekali per folder unik, bukan per file di dalam worker."""
+    if preserve_tree:
+        dirs = {output_root / f.parent.relative_to(input_root) for f in files}
+    else:
+        dirs = {output_root}
+    for d in dirs:
+        d.mkdir(parents=True, exist_ok=True)
+
+def estimate_audio_bytes(duration: float, mode: str, sample_rate: Optional[int], bitrate_k: Optional[int]) -> int:
+    if mode == "WAV":
+        return int(duration * (sample_rate or 48000) * 2 * 2)  # pcm_s16le stereo
+    return int(duration * (bitrate_k or 320) * 1000 / 8)
+
+def split_work_root(dst: Path, needed_bytes: int) -> Path:
+    """
+    Folder untuk segmen sementara: tmpfs (RAM) jika tersedia dan cukup ruang,
+    selain itu folder output (satu filesystem dengan hasil akhir).
+    """
+    if os.path.isdir(RAM_DISK_DIR) and os.access(RAM_DISK_DIR, os.W_OK):
+        try:
+            # sisakan ruang 2x untuk segmen + overhead container
+            if shutil.disk_usage(RAM_DISK_DIR).free > needed_bytes * 2:
+                return Path(RAM_DISK_DIR)
+        except OSError:
+            pass
+    return dst.parent
 
-def process_one(
+async def encode_split(
+    src: Path, dst: Path, duration: float, mode: str, stream_selector: str,
+    sample_rate: Optional[int], bitrate_k: Optional[int],
+    use_gpu: bool = False, video_codec: Optional[str] = None,
+    register_cb: Optional[ProcCallback] = None, parts: int = 2
+) -> Tuple[int, str]:
+    """
+    Encode file panjang per segmen waktu secara paralel, lalu gabungkan
+    dengan concat demuxer (-c copy). Tiap segmen memakai satu thread.
+    Hanya untuk WAV: PCM tidak punya encoder delay/padding sehingga sambungan
+    tepat per sampel. Segmen MP3/AAC membawa delay, padding, dan header
+    Xing/priming masing-masing, jadi hasil concat-nya tidak gapless.
+    """
+    step = duration / parts
+    work_root = split_work_root(dst, estimate_audio_bytes(duration, mode, sample_rate, bitrate_k))
+    work_dir = Path(tempfile.mkdtemp(prefix=f".{dst.stem}.", dir=work_root))
+    try:
+        part_files = [work_dir / f"part{i:02d}{dst.suffix}" for i in range(parts)]
+        cmds = [
+            build_ffmpeg_cmd(
+                src, part, mode, stream_selector, False, sample_rate, bitrate_k, use_gpu, video_codec,
+                start=i * step, end=None if i == parts - 1 else (i + 1) * step, threads=1
+            )
+            for i, part in enumerate(part_files)
+        ]
+        results = await asyncio.gather(
+            *(run_cmd_async(c, capture_stdout=False, register_cb=register_cb) for c in cmds)
+        )
+        for code, _, err in results:
+            if code != 0:
+                return code, err
+
+        list_file = work_dir / "list.txt"
+        with open(list_file, "w", encoding="utf-8") as f:
+            for part in part_files:
+                escaped = str(part).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        code, _, err = await run_cmd_async(
+            build_concat_cmd(list_file, dst), capture_stdout=False, register_cb=register_cb
+        )
+        return code, err
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def sidecar_path(dst: Path) -> Path:
+    return dst.with_name(f".{dst.name}.meta")
+
+def source_fingerprint(src: Path, settings: dict, hash_head: bool = True) -> dict:
+    """
+    Sidik jari sumber + pengaturan encode untuk sidecar skip.
+    hash_head=False (COPY) cukup mtime + ukuran, tanpa membaca isi file.
+    """
+    st = src.stat()
+    fingerprint = {
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "settings": settings,
+    }
+    if hash_head:
+        h = hashlib.sha1()
+        with open(src, "rb") as f:
+            h.update(f.read(HASH_HEAD_BYTES))
+        fingerprint["sha1_head"] = h.hexdigest()
+    return fingerprint
+
+def is_up_to_date(src: Path, dst: Path, mode: str, fingerprint: dict) -> bool:
+    """
+    True jika dst sudah hasil dari src dan tidak perlu diproses ulang:
+    dst tidak kosong dan sidecar cocok (sumber + track/pengaturan yang sama).
+    COPY juga mensyaratkan dst lebih baru dari src.
+    """
+    try:
+        dst_st = dst.stat()
+    except OSError:
+        return False
+    if dst_st.st_size <= 0:
+        return False
+    if mode == "COPY" and dst_st.st_mtime_ns <= src.stat().st_mtime_ns:
+        return False
+    try:
+        with open(sidecar_path(dst), "r", encoding="utf-8") as f:
+            return json.load(f) == fingerprint
+    except (OSError, ValueError):
+        return False
+
+def write_sidecar(dst: Path, fingerprint: dict) -> None:
+    try:
+        with open(sidecar_path(dst), "w", encoding="utf-8") as f:
+            json.dump(fingerprint, f)
+    except OSError:
+        pass
+
+def remux_copy_audio(src: Path, dst: Path, stream_selector: str) -> None:
+    """Remux satu stream audio ke dst tanpa subprocess ffmpeg (butuh PyAV)."""
+    with av.open(str(src)) as in_container:
+        audio = list(in_container.streams.audio)
+        info = {
+            "audio_streams": [
+                {"index": st.index, "lang": st.metadata.get("language"), "codec": st.codec_context.name}
+                for st in audio
+            ]
+        }
+        selected = select_audio_stream(info, stream_selector)
+        if selected is None:
+            raise ValueError(f"Stream audio {stream_selector} tidak ditemukan.")
+        in_stream = next(st for st in audio if st.index == selected["index"])
+
+        with av.open(str(dst), "w") as out_container:
+            if hasattr(out_container, "add_stream_from_template"):
+                out_stream = out_container.add_stream_from_template(in_stream)
+            else:
+                out_stream = out_container.add_stream(template=in_stream)
+            for packet in in_container.demux(in_stream):
+                # packet flush di akhir stream tidak punya dts
+                if packet.dts is None:
+                    continue
+                packet.stream = out_stream
+                out_container.mux(packet)
+
+async def process_one(
     src: Path, input_root: Path, output_root: Path, preserve_tree: bool,
     mode: str, stream_selector: str, loudnorm: bool,
     sample_rate: Optional[int], bitrate_k: Optional[int],
-    use_gpu: bool = False
+    use_gpu: bool = False, probe: Optional[dict] = None,
+    threads: Optional[int] = None, affinity: Optional[Set[int]] = None,
+    register_cb: Optional[ProcCallback] = None, split_parts: int = 1
 ) -> Tuple[Path, bool, str]:
     try:
-        dst = make_out_path(src, input_root, output_root, preserve_tree, mode, stream_selector)
-        cmd = build_ffmpeg_cmd(src, dst, mode, stream_selector, loudnorm, sample_rate, bitrate_k, use_gpu)
-        code, _, err = run_cmd(cmd)
+        info = probe or {}
+        video_codec = info.get("video_codec")
+        duration = info.get("duration")
+        dst = make_out_path(src, input_root, output_root, preserve_tree, mode, stream_selector, probe)
+
+        if mode == "COPY":
+            # COPY tidak di-hash, tapi track yang dipilih tetap dicatat di sidecar
+            fingerprint = source_fingerprint(src, {"mode": mode, "stream": stream_selector}, hash_head=False)
+        else:
+            settings = {
+                "mode": mode, "stream": stream_selector, "loudnorm": loudnorm,
+                "sample_rate": sample_rate, "bitrate_k": bitrate_k,
+            }
+            fingerprint = await asyncio.to_thread(source_fingerprint, src, settings)
+        if is_up_to_date(src, dst, mode, fingerprint):
+            return src, True, f"{dst} (sudah ada, dilewati)"
+
+        code = None
+        if mode == "COPY" and av is not None and not loudnorm:
+            try:
+                await asyncio.to_thread(remux_copy_audio, src, dst, stream_selector)
+                code, err = 0, ""
+            except Exception:
+                # format yang tidak didukung PyAV: ulangi lewat ffmpeg
+                dst.unlink(missing_ok=True)
+
+        if code is None:
+            # loudnorm bersifat dinamis per segmen, jadi file dengan loudnorm tidak dipecah
+            # split hanya untuk WAV (concat PCM tepat per sampel) dan jika ada core bebas per worker
+            if (mode == "WAV" and not loudnorm and split_parts >= 2
+                    and duration and duration > SPLIT_THRESHOLD_SEC):
+                code, err = await encode_split(
+                    src, dst, duration, mode, stream_selector, sample_rate, bitrate_k, use_gpu, video_codec,
+                    register_cb=register_cb, parts=split_parts
+                )
+            else:
+                measured = None
+                if loudnorm and mode != "COPY":
+                    measured = await measure_loudness(src, stream_selector, affinity, register_cb)
+                cmd = build_ffmpeg_cmd(
+                    src, dst, mode, stream_selector, loudnorm, sample_rate, bitrate_k, use_gpu, video_codec,
+                    threads=threads, loudnorm_measured=measured
+                )
+                code, _, err = await run_cmd_async(
+                    cmd, capture_stdout=False, affinity=affinity, register_cb=register_cb
+                )
         if code != 0:
+            # hapus output setengah jadi agar tidak dianggap selesai saat run berikutnya
+            dst.unlink(missing_ok=True)
             return src, False, err.strip()
+        write_sidecar(dst, fingerprint)
         return src, True, str(dst)
     except Exception as e:
         return src, False, str(e)
@@ -195,36 +974,43 @@ class App(tk.Tk):
         png_path = resource_path("app.png")         # ikon window (disarankan PNG)
         ico_path = resource_path("favicon.ico")     # fallback ICO (Windows)
 
-        set_ok = False
-        try:
-            if os.path.exists(png_path):
-                self.iconphoto(False, PhotoImage(file=png_path))
-                set_ok = True
-        except Exception as e:
-            print(f"[Icon] PNG gagal: {e}")
-
-        if not set_ok:
+        # PhotoImage disimpan di self agar tidak di-GC (Tk diam-diam membuang ikonnya)
+        self._icon_img: Optional[PhotoImage] = None
+        errors = []
+        for path, apply_icon in (
+            (png_path, self._set_icon_png),
+            (ico_path, self.iconbitmap),       # fallback ICO (Windows)
+        ):
+            if not os.path.exists(path):
+                continue
             try:
-                if os.path.exists(ico_path):
-                    self.iconbitmap(ico_path)
-                    set_ok = True
-            except Exception as e:
-                print(f"[Icon] ICO gagal: {e}")
-
-        if not set_ok:
-            print("[Icon] Ikon tidak dipasang, lanjut dengan ikon default.")
-            
-        self.iconbitmap(ico_path)
+                apply_icon(path)
+                break
+            except tk.TclError as e:
+                errors.append(f"{os.path.basename(path)}: {e}")
+        else:
+            detail = f" ({'; '.join(errors)})" if errors else ""
+            print(f"[Icon] Ikon tidak dipasang, lanjut dengan ikon default.{detail}")
+
         self.title("Audio Extractor")
         self.geometry("860x660")
         self.minsize(860, 660)
 
         self.stop_event = threading.Event()
-        self.ui_queue = queue.Queue()
+        # proses ffmpeg yang sedang berjalan; hanya disentuh dari thread event loop batch
+        self._running_procs: Set[asyncio.subprocess.Process] = set()
+        self._batch_loop: Optional[asyncio.AbstractEventLoop] = None
+        # deque.append/popleft thread-safe di CPython, tanpa mutex seperti queue.Queue
+        self.ui_queue: deque = deque()
+        self.ui_event = threading.Event()
 
         self._build_ui()
         self._after_poll()
 
+    def _set_icon_png(self, path: str):
+        self._icon_img = PhotoImage(file=path)
+        self.iconphoto(False, self._icon_img)
+
     def _build_ui(self):
         pad = {"padx": 10, "pady": 6}
 
@@ -258,7 +1044,7 @@ class App(tk.Tk):
         self.gpu_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(frm_opts, text="Rekursif", variable=self.recursive_var).grid(row=0, column=2, sticky="w", padx=12)
         ttk.Checkbutton(frm_opts, text="Pertahankan struktur folder", variable=self.preserve_var).grid(row=0, column=3, sticky="w", padx=12)
-        ttk.Checkbutton(frm_opts, text="Gunakan GPU (CUDA)", variable=self.gpu_var).grid(row=0, column=4, sticky="w", padx=12)
+        ttk.Checkbutton(frm_opts, text="Gunakan GPU (CUDA)", variable=self.gpu_var, command=self.on_gpu_toggle).grid(row=0, column=4, sticky="w", padx=12)
 
         # Stream selector
         self.sel_mode_var = tk.StringVar(value="index")
@@ -341,6 +1127,9 @@ class App(tk.Tk):
         # Status kecil manis
         self.set_status("Preset 'Optimasi Lagu + GPU' diterapkan.")
 
+    def on_gpu_toggle(self):
+        self.workers_var.set(str(compute_optimal_workers(self.gpu_var.get())))
+
     # UI helpers
     def pick_in(self):
         path = filedialog.askdirectory(title="Pilih input folder")
@@ -352,33 +1141,51 @@ class App(tk.Tk):
         if path:
             self.out_var.set(path)
 
+    def _post(self, kind: str, data):
+        self.ui_queue.append((kind, data))
+        self.ui_event.set()
+
     def log(self, text: str):
-        self.ui_queue.put(("log", text))
+        self._post("log", text)
 
     def set_status(self, text: str):
-        self.ui_queue.put(("status", text))
+        self._post("status", text)
 
     def set_progress(self, value: int, total: int):
-        self.ui_queue.put(("progress", (value, total)))
+        self._post("progress", (value, total))
 
     def _after_poll(self):
-        try:
-            while True:
-                kind, data = self.ui_queue.get_nowait()
-                if kind == "log":
-                    self.log_widget.configure(state="normal")
-                    self.log_widget.insert("end", data + "\n")
-                    self.log_widget.see("end")
-                    self.log_widget.configure(state="disabled")
-                elif kind == "status":
-                    self.status_var.set(data)
-                elif kind == "progress":
-                    val, total = data
-                    self.progress["maximum"] = max(1, total)
-                    self.progress["value"] = val
-        except queue.Empty:
-            pass
-        self.after(50, self._after_poll)
+        busy = self.ui_event.is_set()
+        self.ui_event.clear()
+        lines = []
+        status = None
+        progress = None
+        while self.ui_queue:
+            kind, data = self.ui_queue.popleft()
+            if kind == "log":
+                lines.append(data)
+            elif kind == "status":
+                status = data
+            elif kind == "progress":
+                progress = data
+        # status & progress: cukup nilai terakhir per tick
+        if status is not None:
+            self.status_var.set(status)
+        if progress is not None:
+            val, total = progress
+            self.progress["maximum"] = max(1, total)
+            self.progress["value"] = val
+        if lines:
+            # satu insert per tick, bukan per baris
+            self.log_widget.configure(state="normal")
+            self.log_widget.insert("end", "\n".join(lines) + "\n")
+            line_count = int(self.log_widget.index("end-1c").split(".")[0]) - 1
+            excess = line_count - LOG_MAX_LINES
+            if excess > 0:
+                self.log_widget.delete("1.0", f"{excess + 1}.0")
+            self.log_widget.see("end")
+            self.log_widget.configure(state="disabled")
+        self.after(POLL_BUSY_MS if busy else POLL_IDLE_MS, self._after_poll)
 
     def start(self):
         ok, msg = ff_tools_ok()
@@ -422,11 +1229,13 @@ class App(tk.Tk):
             messagebox.showerror("Error", "Input folder tidak valid.")
             return
         output_dir.mkdir(parents=True, exist_ok=True)
+        load_probe_cache(output_dir / PROBE_CACHE_NAME)
 
         files = scan_files(input_dir, recursive)
         if not files:
             messagebox.showinfo("Info", "Tidak ada file video ditemukan.")
             return
+        make_out_dirs(files, input_dir, output_dir, preserve)
 
         # lock UI
         self.btn_start.config(state="disabled")
@@ -437,6 +1246,8 @@ class App(tk.Tk):
         self.progress["maximum"] = len(files)
         self.set_status(f"Ditemukan {len(files)} file. Memulai...")
 
+        # slot yang benar-benar terisi: batch kecil menyisakan core untuk thread/segmen
+        active = min(workers, len(files))
         args = dict(
             input_root=input_dir,
             output_root=output_dir,
@@ -447,6 +1258,10 @@ class App(tk.Tk):
             sample_rate=sample_rate,
             bitrate_k=bitrate_k,
             use_gpu=self.gpu_var.get(),
+            # thread ffmpeg per proses jika tidak di-pin (worker melebihi pasangan core)
+            threads=max(1, DEFAULT_WORKERS // active),
+            # jumlah segmen per file panjang: core yang tersisa per slot aktif
+            split_parts=min(SPLIT_MAX_PARTS, max(1, DEFAULT_WORKERS // active)),
         )
 
         threading.Thread(target=self._run_batch, args=(files, args, workers), daemon=True).start()
@@ -454,18 +1269,56 @@ class App(tk.Tk):
     def cancel(self):
         self.stop_event.set()
         self.set_status("Membatalkan...")
+        loop = self._batch_loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._stop_running_procs)
+            except RuntimeError:
+                pass  # loop sudah ditutup, batch sudah selesai
+
+    # ---- dipanggil dari thread event loop batch ----
+    def _track_proc(self, proc: asyncio.subprocess.Process, running: bool):
+        if running:
+            self._running_procs.add(proc)
+            # proses yang baru diluncurkan setelah Cancel langsung dihentikan juga
+            if self.stop_event.is_set():
+                self._stop_proc(proc)
+        else:
+            self._running_procs.discard(proc)
 
-    def _run_batch(self, files: List[Path], args: dict, workers: int):
-        ok_count = 0
-        fail_count = 0
-        done = 0
-        total = len(files)
+    def _stop_running_procs(self):
+        for proc in list(self._running_procs):
+            self._stop_proc(proc)
+
+    def _stop_proc(self, proc: asyncio.subprocess.Process):
+        """SIGINT (POSIX, ffmpeg flush lalu keluar) / terminate (Windows), kill jika belum keluar."""
+        try:
+            if sys.platform == "win32":
+                proc.terminate()
+            else:
+                proc.send_signal(signal.SIGINT)
+        except (ProcessLookupError, OSError):
+            return
+        asyncio.get_running_loop().call_later(CANCEL_GRACE_SEC, self._kill_proc, proc)
 
-        def task(f: Path):
+    def _kill_proc(self, proc: asyncio.subprocess.Process):
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except (ProcessLookupError, OSError):
+                pass
+
+    async def _run_one(
+        self, src: Path, args: dict, probe: Optional[dict],
+        slots: "asyncio.Queue[int]", worker_cores: Dict[int, Set[int]]
+    ):
+        slot = await slots.get()
+        try:
             if self.stop_event.is_set():
-                return f, False, "Dibatalkan."
-            return process_one(
-                f,
+                return src, False, "Dibatalkan."
+            cores = worker_cores.get(slot)
+            return await process_one(
+                src,
                 args["input_root"],
                 args["output_root"],
                 args["preserve_tree"],
@@ -474,30 +1327,85 @@ class App(tk.Tk):
                 args["loudnorm"],
                 args["sample_rate"],
                 args["bitrate_k"],
-                args["use_gpu"]
+                args["use_gpu"],
+                probe,
+                len(cores) if cores else args["threads"],
+                cores,
+                self._track_proc,
+                split_parts=args["split_parts"]
             )
+        finally:
+            slots.put_nowait(slot)
+
+    async def _run_batch_async(self, files: List[Path], args: dict, workers: int,
+                               probes: Dict[Path, dict]):
+        ok_count = 0
+        fail_count = 0
+        done = 0
+        total = len(files)
 
+        # slot worker membatasi konkurensi sekaligus menentukan core tempat ffmpeg di-pin
+        slots: "asyncio.Queue[int]" = asyncio.Queue()
+        for slot in range(workers):
+            slots.put_nowait(slot)
+        # COPY hanya remux (I/O-bound), pinning hanya untuk re-encode
+        worker_cores = assign_worker_cores(workers) if args["mode"] != "COPY" else {}
+        tasks = [
+            asyncio.ensure_future(self._run_one(f, args, probes.get(f), slots, worker_cores))
+            for f in files
+        ]
         try:
-            with ThreadPoolExecutor(max_workers=workers) as ex:
-                futures = [ex.submit(task, f) for f in files]
-                for fut in as_completed(futures):
-                    if self.stop_event.is_set():
-                        break
-                    src, success, msg = fut.result()
-                    done += 1
-                    if success:
-                        ok_count += 1
-                        self.log(f"[OK] {src.name} -> {msg}")
-                    else:
-                        fail_count += 1
-                        self.log(f"[FAIL] {src.name} :: {msg}")
-                    self.set_progress(done, total)
-                    self.set_status(f"Proses: {done}/{total} | OK: {ok_count} | Gagal: {fail_count}")
+            for fut in asyncio.as_completed(tasks):
+                src, success, msg = await fut
+                if not success and self.stop_event.is_set():
+                    # gagal setelah Cancel = dihentikan / belum mulai, tidak dihitung;
+                    # yang sempat selesai tetap dicatat karena output-nya sudah ada di disk
+                    continue
+                done += 1
+                if success:
+                    ok_count += 1
+                    self.log(f"[OK] {src.name} -> {msg}")
+                else:
+                    fail_count += 1
+                    self.log(f"[FAIL] {src.name} :: {msg}")
+                self.set_progress(done, total)
+                self.set_status(f"Proses: {done}/{total} | OK: {ok_count} | Gagal: {fail_count}")
+        finally:
+            # tunggu proses yang sedang berjalan (yang belum mulai langsung return "Dibatalkan.")
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return ok_count, fail_count
+
+    def _run_batch(self, files: List[Path], args: dict, workers: int):
+        ok_count = 0
+        fail_count = 0
+        total = len(files)
+        probes: Dict[Path, dict] = {}
+
+        loop = asyncio.new_event_loop()
+        self._batch_loop = loop
+        try:
+            self.set_status(f"Membaca metadata {total} file...")
+            if args["mode"] == "COPY":
+                # COPY cukup butuh codec audio: cache dulu, lalu header container, ffprobe hanya sisanya
+                for f in files:
+                    info = cached_probe(f) or sniff_probe(f)
+                    stream = select_audio_stream(info, args["stream_selector"]) if info else None
+                    if stream and stream["codec"]:
+                        probes[f] = info
+            rest = [f for f in files if f not in probes]
+            probes.update(batch_probe_files(rest, min(32, len(rest))))
+
+            ok_count, fail_count = loop.run_until_complete(
+                self._run_batch_async(files, args, workers, probes)
+            )
 
         except Exception as e:
             self.log(f"[ERROR] {e}")
 
         finally:
+            self._batch_loop = None
+            loop.close()
+            save_probe_cache(args["output_root"] / PROBE_CACHE_NAME, files)
             self.btn_start.config(state="normal")
             self.btn_cancel.config(state="disabled")
             self.btn_preset_music_gpu.config(state="normal")